@@ -1,55 +1,66 @@
 """This module provides functions for processing audio files."""
-import subprocess
-from tempfile import NamedTemporaryFile
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 from whisperx import load_audio
 from whisperx.audio import SAMPLE_RATE
 
-from .files import VIDEO_EXTENSIONS, check_file_extension
+from .config import Config
 
+# RMS level (about -80 dBFS) below which a waveform is treated as silence
+SILENCE_RMS_THRESHOLD = 1e-4
 
-def convert_video_to_audio(file):
+# Dedicated pool for ffmpeg decodes so they don't compete with the
+# request threadpool used for sync routes and dependencies
+AUDIO_DECODE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=Config.AUDIO_DECODE_WORKERS, thread_name_prefix="audio-decode"
+)
+
+
+def process_audio_file(audio_file):
     """
-    Convert a video file to an audio file.
+    Decode an audio or video file into a 16kHz mono waveform.
+
+    ffmpeg reads the audio track of video containers directly, so no
+    intermediate WAV file is written. The input stays on disk because
+    containers such as mp4 may need seeking, which a stdin pipe can't do.
 
     Args:
-        file (str): The path to the video file.
+        audio_file (str): The path to the audio or video file.
+    Returns:
+        Audio: The processed audio.
+    """
+    return load_audio(audio_file)
+
 
+async def process_audio_file_async(audio_file):
+    """
+    Decode an audio or video file on the audio decode executor.
+
+    Args:
+        audio_file (str): The path to the audio or video file.
     Returns:
-        str: The path to the audio file.
+        Audio: The processed audio.
     """
-    temp_filename = NamedTemporaryFile(delete=False).name
-    subprocess.call(
-        [
-            "ffmpeg",
-            "-y",  # Overwrite output file if it exists"
-            "-i",
-            file,
-            "-vn",
-            "-ac",
-            "1",  # Mono audio
-            "-ar",
-            "16000",  # Sample rate of 16kHz
-            "-f",
-            "wav",  # Output format WAV
-            temp_filename,
-        ]
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        AUDIO_DECODE_EXECUTOR, process_audio_file, audio_file
     )
-    return temp_filename
 
 
-def process_audio_file(audio_file):
+def is_silent(audio, threshold=SILENCE_RMS_THRESHOLD):
     """
-    Check file if it is audio file, if it is video file, convert it to audio file.
+    Check whether the audio is silent using its RMS energy.
 
     Args:
-        audio_file (str): The path to the audio file.
+        audio (Audio): The decoded audio.
+        threshold (float): RMS level below which the audio is silent.
     Returns:
-        Audio: The processed audio.
+        bool: True if the audio is empty or below the threshold.
     """
-    if check_file_extension(audio_file) in VIDEO_EXTENSIONS:
-        audio_file = convert_video_to_audio(audio_file)
-    return load_audio(audio_file)
+    if len(audio) == 0:
+        return True
+    return float(audio.dot(audio)) / len(audio) < threshold**2
 
 
 def get_audio_duration(audio):
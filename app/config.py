@@ -17,7 +17,7 @@ class Config:
     WHISPER_MODEL = os.getenv("WHISPER_MODEL")
     DEVICE = os.getenv("DEVICE", "cuda" if torch.cuda.is_available() else "cpu")
     COMPUTE_TYPE = os.getenv(
-        "COMPUTE_TYPE", "float16" if torch.cuda.is_available() else "int8"
+        "COMPUTE_TYPE", "int8_float16" if torch.cuda.is_available() else "int8"
     )
     ENVIRONMENT = os.getenv("ENVIRONMENT", "production").lower()
     LOG_LEVEL = os.getenv(
@@ -39,3 +39,25 @@ class Config:
     ALLOWED_EXTENSIONS = AUDIO_EXTENSIONS | VIDEO_EXTENSIONS
 
     DB_URL = os.getenv("DB_URL", "sqlite:///records.db")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))
+
+    # Seconds to wait for a URL download to connect, and for each chunk of it;
+    # without DOWNLOAD_READ_TIMEOUT a slow download is never cut off
+    DOWNLOAD_CONNECT_TIMEOUT = float(os.getenv("DOWNLOAD_CONNECT_TIMEOUT", 10))
+    DOWNLOAD_READ_TIMEOUT = (
+        float(os.getenv("DOWNLOAD_READ_TIMEOUT"))
+        if os.getenv("DOWNLOAD_READ_TIMEOUT")
+        else None
+    )
+
+    CACHE_TTL_PROCESSING = float(os.getenv("CACHE_TTL_PROCESSING", 2))
+    CACHE_TTL_DONE = float(os.getenv("CACHE_TTL_DONE", 300))
+
+    PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "false").lower() == "true"
+    MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", 3))
+    MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", 1))
+
+    AUDIO_DECODE_WORKERS = int(os.getenv("AUDIO_DECODE_WORKERS", os.cpu_count() or 1))
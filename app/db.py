@@ -3,20 +3,61 @@
 import os
 from functools import wraps
 
+import orjson
 from dotenv import load_dotenv
 from fastapi import HTTPException
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from .config import Config
 
 # Load environment variables from .env
 load_dotenv()
 
+
+def json_serializer(obj):
+    """Serialize JSON columns with orjson, which also handles numpy scalars from whisperX."""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
 # Create engine and session
 DB_URL = Config.DB_URL
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
+engine_options = {"pool_pre_ping": True}
+# Leave pooling to an external pooler such as PgBouncer
+if Config.DB_POOL_SIZE == 0:
+    engine_options["poolclass"] = NullPool
+# An in-memory SQLite database lives in a single connection and keeps its own pool
+elif make_url(DB_URL).database not in (None, "", ":memory:"):
+    engine_options.update(
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+    )
+engine = create_engine(
+    DB_URL,
+    connect_args={"check_same_thread": False},
+    json_serializer=json_serializer,
+    json_deserializer=orjson.loads,
+    **engine_options,
+)
+
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Let SQLite readers run alongside the writer and skip an fsync per commit."""
+    if engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -2,6 +2,7 @@
 
 import logging
 import os
+import shutil
 from tempfile import NamedTemporaryFile
 
 from fastapi import HTTPException
@@ -15,6 +16,10 @@ logger = logging.getLogger(__name__)
 AUDIO_EXTENSIONS = Config.AUDIO_EXTENSIONS
 VIDEO_EXTENSIONS = Config.VIDEO_EXTENSIONS
 ALLOWED_EXTENSIONS = Config.ALLOWED_EXTENSIONS
+JSON_EXTENSIONS = {".json"}
+
+# Size of the chunks used to copy uploads to disk
+COPY_CHUNK_SIZE = 1024 * 1024
 
 
 def validate_extension(filename, allowed_extensions: dict):
@@ -57,8 +62,8 @@ def save_temporary_file(temporary_file, original_filename):
     # Create a temporary file with the original extension
     temp_filename = NamedTemporaryFile(suffix=original_extension, delete=False).name
 
-    # Write the contents of the SpooledTemporaryFile to the temporary file
+    # Stream the contents of the SpooledTemporaryFile to the temporary file in chunks
     with open(temp_filename, "wb") as dest:
-        dest.write(temporary_file.read())
+        shutil.copyfileobj(temporary_file, dest, COPY_CHUNK_SIZE)
 
     return temp_filename
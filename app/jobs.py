@@ -0,0 +1,64 @@
+"""This module runs audio processing jobs on a bounded worker pool."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import Config
+from .db import SessionLocal
+from .logger import logger  # Import the logger from the new module
+from .tasks import update_task_status_in_db
+
+# Bounded pool so concurrent requests wait in a queue instead of all loading
+# models onto the GPU at once
+JOB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=Config.MAX_CONCURRENT_JOBS, thread_name_prefix="job"
+)
+
+
+def run_job(identifier, func, *args):
+    """
+    Run a processing function with a database session of its own.
+
+    Errors the processing function does not handle itself mark the task as
+    failed, so it is not left processing forever.
+
+    Args:
+        identifier (str): Identifier of the task the job processes.
+        func (callable): The processing function, taking the session as its last argument.
+        *args: Arguments for the processing function, without the session.
+    """
+    session = SessionLocal()
+    try:
+        func(*args, session)
+    except Exception as e:
+        logger.exception(
+            "Unhandled error in job %s for task %s", func.__name__, identifier
+        )
+        session.rollback()
+        try:
+            update_task_status_in_db(
+                identifier=identifier,
+                update_data={"status": "failed", "error": str(e)},
+                session=session,
+            )
+        except Exception:
+            logger.exception("Could not mark task %s as failed", identifier)
+    finally:
+        session.close()
+
+
+def submit_job(identifier, func, *args):
+    """
+    Queue a processing function on the job executor.
+
+    The job does not use the request's session, so the request's database
+    connection is released as soon as the response is sent.
+
+    Args:
+        identifier (str): Identifier of the task the job processes.
+        func (callable): The processing function, taking the session as its last argument.
+        *args: Arguments for the processing function, without the session.
+
+    Returns:
+        Future: The future of the queued job.
+    """
+    return JOB_EXECUTOR.submit(run_job, identifier, func, *args)
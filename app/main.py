@@ -8,14 +8,18 @@ from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
+from starlette.concurrency import run_in_threadpool
 
+from .audio import AUDIO_DECODE_EXECUTOR
 from .config import Config
 from .db import engine
 from .docs import generate_db_schema, save_openapi_json
 from .files import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS
+from .jobs import JOB_EXECUTOR
 from .models import Base
-from .routers import stt, stt_services, task
+from .routers import model_cache, stt, stt_services, task
+from .whisperx_services import preload_models
 
 # Load environment variables from .env
 load_dotenv()
@@ -29,14 +33,20 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for the FastAPI application.
 
     This function is used to perform startup and shutdown tasks for the FastAPI application.
-    It saves the OpenAPI JSON and generates the database schema.
+    It saves the OpenAPI JSON, generates the database schema and, when
+    PRELOAD_MODELS is enabled, loads the default models before serving requests.
 
     Args:
         app (FastAPI): The FastAPI application instance.
     """
     save_openapi_json(app)
     generate_db_schema(Base.metadata.tables.values())
+    if Config.PRELOAD_MODELS:
+        await run_in_threadpool(preload_models)
     yield
+    await stt.http_client.aclose()
+    AUDIO_DECODE_EXECUTOR.shutdown(wait=False)
+    JOB_EXECUTOR.shutdown(wait=False)
 
 
 tags_metadata = [
@@ -52,6 +62,10 @@ tags_metadata = [
         "name": "Tasks Management",
         "description": "Manage tasks.",
     },
+    {
+        "name": "Models Management",
+        "description": "Manage the loaded models.",
+    },
 ]
 
 
@@ -84,12 +98,14 @@ app = FastAPI(
     version="0.0.1",
     openapi_tags=tags_metadata,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Include routers
 app.include_router(stt.stt_router)
 app.include_router(task.task_router)
 app.include_router(stt_services.service_router)
+app.include_router(model_cache.model_router)
 
 
 @app.get("/", response_class=RedirectResponse, include_in_schema=False)
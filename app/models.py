@@ -1,14 +1,33 @@
 """This module defines the database models for the application."""
 
-from datetime import datetime
-from uuid import uuid4
+import os
+import time
+from uuid import UUID
 
-from sqlalchemy import JSON, Column, DateTime, Float, Integer, String
+from sqlalchemy import JSON, Column, DateTime, Float, Integer, String, func
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
 
+def uuid7():
+    """
+    Generate a time-ordered UUID (version 7, RFC 9562).
+
+    The leading 48 bits hold the Unix time in milliseconds, so identifiers of new
+    tasks are appended to the end of the uuid index instead of landing at random pages.
+
+    Returns:
+        str: The UUID in its canonical string form.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    random_bits = int.from_bytes(os.urandom(10), "big")
+    value = (timestamp_ms & 0xFFFFFFFFFFFF) << 80 | random_bits
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return str(UUID(int=value))
+
+
 class Task(Base):
     """
     Table to store tasks information.
@@ -35,7 +54,9 @@ class Task(Base):
     )
     uuid = Column(
         String,
-        default=lambda: str(uuid4()),
+        default=uuid7,
+        unique=True,
+        index=True,
         comment="Universally unique identifier for each task",
     )
     status = Column(String, comment="Current status of the task")
@@ -50,12 +71,18 @@ class Task(Base):
     start_time = Column(DateTime, comment="Start time of the task execution")
     end_time = Column(DateTime, comment="End time of the task execution")
     error = Column(String, comment="Error message, if any, associated with the task")
+    # default renders now() in every INSERT, so tables created before the
+    # server_default existed (create_all never alters them) are stamped too
     created_at = Column(
-        DateTime, default=datetime.utcnow, comment="Date and time of creation"
+        DateTime,
+        default=func.now(),
+        server_default=func.now(),
+        comment="Date and time of creation",
     )
     updated_at = Column(
         DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        default=func.now(),
+        server_default=func.now(),
+        onupdate=func.now(),
         comment="Date and time of last update",
     )
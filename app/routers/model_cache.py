@@ -0,0 +1,19 @@
+"""This module contains the model management routes for the FastAPI application."""
+
+from fastapi import APIRouter
+
+from ..whisperx_services import clear_model_cache
+
+model_router = APIRouter()
+
+
+@model_router.post("/models/flush", tags=["Models Management"])
+def flush_model_cache() -> dict:
+    """
+    Release every cached Whisper, alignment and diarization model.
+
+    Returns:
+        dict: Message with the number of flushed models.
+    """
+    count = clear_model_cache()
+    return {"message": f"Flushed {count} models"}
@@ -6,16 +6,17 @@ It includes endpoints for processing uploaded audio files and audio files from U
 
 import logging
 import os
-from datetime import datetime
 from tempfile import NamedTemporaryFile
 
-import requests
-from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, UploadFile
+import httpx
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from ..audio import get_audio_duration, process_audio_file
+from ..config import Config
 from ..db import get_db_session
 from ..files import ALLOWED_EXTENSIONS, save_temporary_file, validate_extension
+from ..jobs import submit_job
 from ..logger import logger  # Import the logger from the new module
 from ..schemas import (
     AlignmentParams,
@@ -24,7 +25,9 @@ from ..schemas import (
     Response,
     SpeechToTextProcessingParams,
     VADOptions,
-    WhsiperModelParams,
+    WhisperModelParams,
+    async_dependency,
+    task_queued_response,
 )
 from ..tasks import add_task_to_db
 from ..whisperx_services import process_audio_common
@@ -34,49 +37,52 @@ logging.basicConfig(level=logging.INFO)
 
 stt_router = APIRouter()
 
+# Size of the chunks read from the network when downloading from a URL
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Shared client so URL downloads reuse pooled connections; closed on shutdown
+http_client = httpx.AsyncClient(
+    follow_redirects=True,
+    timeout=httpx.Timeout(
+        None,
+        connect=Config.DOWNLOAD_CONNECT_TIMEOUT,
+        read=Config.DOWNLOAD_READ_TIMEOUT,
+    ),
+)
 
-@stt_router.post("/speech-to-text", tags=["Speech-2-Text"])
-async def speech_to_text(
-    background_tasks: BackgroundTasks,
-    model_params: WhsiperModelParams = Depends(),
-    align_params: AlignmentParams = Depends(),
-    diarize_params: DiarizationParams = Depends(),
-    asr_options_params: ASROptions = Depends(),
-    vad_options_params: VADOptions = Depends(),
-    file: UploadFile = File(...),
-    session: Session = Depends(get_db_session),
+
+async def schedule_speech_to_text(
+    audio_file: str,
+    file_name: str,
+    model_params: WhisperModelParams,
+    align_params: AlignmentParams,
+    diarize_params: DiarizationParams,
+    asr_options_params: ASROptions,
+    vad_options_params: VADOptions,
+    session: Session,
+    url: str = None,
 ) -> Response:
     """
-    Process an uploaded audio file for speech-to-text conversion.
+    Record a full speech-to-text task and schedule its processing.
 
     Args:
-        background_tasks (BackgroundTasks): Background tasks dependency.
-        model_params (WhsiperModelParams): Whisper model parameters.
+        audio_file (str): Path to the saved audio or video file.
+        file_name (str): Name of the file stored with the task.
+        model_params (WhisperModelParams): Whisper model parameters.
         align_params (AlignmentParams): Alignment parameters.
         diarize_params (DiarizationParams): Diarization parameters.
         asr_options_params (ASROptions): ASR options parameters.
         vad_options_params (VADOptions): VAD options parameters.
-        file (UploadFile): Uploaded audio file.
         session (Session): Database session dependency.
+        url (str, optional): URL the file was downloaded from.
 
     Returns:
         Response: Confirmation message of task queuing.
     """
-    logger.info("Received file upload request: %s", file.filename)
-
-    validate_extension(file.filename, ALLOWED_EXTENSIONS)
-
-    temp_file = save_temporary_file(file.file, file.filename)
-    logger.info("%s saved as temporary file: %s", file.filename, temp_file)
-
-    audio = process_audio_file(temp_file)
-    audio_duration = get_audio_duration(audio)
-    logger.info("Audio file %s length: %s seconds", file.filename, audio_duration)
-
-    identifier = add_task_to_db(
+    identifier = await run_in_threadpool(
+        add_task_to_db,
         status="processing",
-        file_name=file.filename,
-        audio_duration=get_audio_duration(audio),
+        file_name=file_name,
         language=model_params.language,
         task_type="full_process",
         task_params={
@@ -86,13 +92,13 @@ async def speech_to_text(
             "vad_options": vad_options_params.model_dump(),
             **diarize_params.model_dump(),
         },
-        start_time=datetime.utcnow(),
+        url=url,
         session=session,
     )
     logger.info("Task added to database: ID %s", identifier)
 
     audio_params = SpeechToTextProcessingParams(
-        audio=audio,
+        audio_file=audio_file,
         identifier=identifier,
         vad_options=vad_options_params,
         asr_options=asr_options_params,
@@ -101,20 +107,63 @@ async def speech_to_text(
         diarization_params=diarize_params,
     )
 
-    background_tasks.add_task(process_audio_common, audio_params, session)
+    submit_job(identifier, process_audio_common, audio_params)
     logger.info("Background task scheduled for processing: ID %s", identifier)
 
-    return Response(identifier=identifier, message="Task queued")
+    return task_queued_response(identifier)
+
+
+@stt_router.post("/speech-to-text", tags=["Speech-2-Text"])
+async def speech_to_text(
+    model_params: WhisperModelParams = Depends(async_dependency(WhisperModelParams)),
+    align_params: AlignmentParams = Depends(async_dependency(AlignmentParams)),
+    diarize_params: DiarizationParams = Depends(async_dependency(DiarizationParams)),
+    asr_options_params: ASROptions = Depends(async_dependency(ASROptions)),
+    vad_options_params: VADOptions = Depends(async_dependency(VADOptions)),
+    file: UploadFile = File(...),
+    session: Session = Depends(get_db_session),
+) -> Response:
+    """
+    Process an uploaded audio file for speech-to-text conversion.
+
+    Args:
+        model_params (WhisperModelParams): Whisper model parameters.
+        align_params (AlignmentParams): Alignment parameters.
+        diarize_params (DiarizationParams): Diarization parameters.
+        asr_options_params (ASROptions): ASR options parameters.
+        vad_options_params (VADOptions): VAD options parameters.
+        file (UploadFile): Uploaded audio file.
+        session (Session): Database session dependency.
+
+    Returns:
+        Response: Confirmation message of task queuing.
+    """
+    logger.info("Received file upload request: %s", file.filename)
+
+    validate_extension(file.filename, ALLOWED_EXTENSIONS)
+
+    temp_file = await run_in_threadpool(save_temporary_file, file.file, file.filename)
+    logger.info("%s saved as temporary file: %s", file.filename, temp_file)
+
+    return await schedule_speech_to_text(
+        temp_file,
+        file.filename,
+        model_params,
+        align_params,
+        diarize_params,
+        asr_options_params,
+        vad_options_params,
+        session,
+    )
 
 
 @stt_router.post("/speech-to-text-url", tags=["Speech-2-Text"])
 async def speech_to_text_url(
-    background_tasks: BackgroundTasks,
-    model_params: WhsiperModelParams = Depends(),
-    align_params: AlignmentParams = Depends(),
-    diarize_params: DiarizationParams = Depends(),
-    asr_options_params: ASROptions = Depends(),
-    vad_options_params: VADOptions = Depends(),
+    model_params: WhisperModelParams = Depends(async_dependency(WhisperModelParams)),
+    align_params: AlignmentParams = Depends(async_dependency(AlignmentParams)),
+    diarize_params: DiarizationParams = Depends(async_dependency(DiarizationParams)),
+    asr_options_params: ASROptions = Depends(async_dependency(ASROptions)),
+    vad_options_params: VADOptions = Depends(async_dependency(VADOptions)),
     url: str = Form(...),
     session: Session = Depends(get_db_session),
 ) -> Response:
@@ -122,8 +171,7 @@ async def speech_to_text_url(
     Process an audio file from a URL for speech-to-text conversion.
 
     Args:
-        background_tasks (BackgroundTasks): Background tasks dependency.
-        model_params (WhsiperModelParams): Whisper model parameters.
+        model_params (WhisperModelParams): Whisper model parameters.
         align_params (AlignmentParams): Alignment parameters.
         diarize_params (DiarizationParams): Diarization parameters.
         asr_options_params (ASROptions): ASR options parameters.
@@ -133,65 +181,52 @@ async def speech_to_text_url(
 
     Returns:
         Response: Confirmation message of task queuing.
+
+    Raises:
+        HTTPException: If the file cannot be downloaded.
     """
     logger.info("Received URL for processing: %s", url)
 
-    # Extract filename from HTTP response headers or URL
-    with requests.get(url, stream=True) as response:
-        response.raise_for_status()
-
-        # Check for filename in Content-Disposition header
-        content_disposition = response.headers.get("Content-Disposition")
-        if content_disposition and "filename=" in content_disposition:
-            filename = content_disposition.split("filename=")[1].strip('"')
-        else:
-            # Fall back to extracting from the URL path
-            filename = os.path.basename(url)
-
-        # Get the file extension
-        _, original_extension = os.path.splitext(filename)
-
-        # Save the file to a temporary location
-        temp_audio_file = NamedTemporaryFile(suffix=original_extension, delete=False)
-        for chunk in response.iter_content(chunk_size=8192):
-            temp_audio_file.write(chunk)
+    temp_audio_file = None
+    try:
+        # Extract filename from HTTP response headers or URL
+        async with http_client.stream("GET", url) as response:
+            response.raise_for_status()
+
+            # Check for filename in Content-Disposition header
+            content_disposition = response.headers.get("Content-Disposition")
+            if content_disposition and "filename=" in content_disposition:
+                filename = content_disposition.split("filename=")[1].strip('"')
+            else:
+                # Fall back to extracting from the URL path
+                filename = os.path.basename(url)
+
+            # Get the file extension
+            _, original_extension = os.path.splitext(filename)
+
+            # Save the file to a temporary location
+            with NamedTemporaryFile(
+                suffix=original_extension, delete=False
+            ) as temp_audio_file:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    temp_audio_file.write(chunk)
+    except httpx.HTTPError as e:
+        logger.error("Failed to download %s: %s", url, e)
+        if temp_audio_file is not None:
+            os.remove(temp_audio_file.name)
+        raise HTTPException(status_code=400, detail=f"Could not download file: {e}")
 
     logger.info("File downloaded and saved temporarily: %s", temp_audio_file.name)
     validate_extension(temp_audio_file.name, ALLOWED_EXTENSIONS)
 
-    audio = process_audio_file(temp_audio_file.name)
-    logger.info("Audio file processed: duration %s seconds", get_audio_duration(audio))
-
-    identifier = add_task_to_db(
-        status="processing",
-        file_name=temp_audio_file.name,
-        audio_duration=get_audio_duration(audio),
-        language=model_params.language,
-        task_type="full_process",
-        task_params={
-            **model_params.model_dump(),
-            **align_params.model_dump(),
-            "asr_options": asr_options_params.model_dump(),
-            "vad_options": vad_options_params.model_dump(),
-            **diarize_params.model_dump(),
-        },
+    return await schedule_speech_to_text(
+        temp_audio_file.name,
+        temp_audio_file.name,
+        model_params,
+        align_params,
+        diarize_params,
+        asr_options_params,
+        vad_options_params,
+        session,
         url=url,
-        start_time=datetime.utcnow(),
-        session=session,
-    )
-    logger.info("Task added to database: ID %s", identifier)
-
-    audio_params = SpeechToTextProcessingParams(
-        audio=audio,
-        identifier=identifier,
-        vad_options=vad_options_params,
-        asr_options=asr_options_params,
-        whisper_model_params=model_params,
-        alignment_params=align_params,
-        diarization_params=diarize_params,
     )
-
-    background_tasks.add_task(process_audio_common, audio_params, session)
-    logger.info("Background task scheduled for processing: ID %s", identifier)
-
-    return Response(identifier=identifier, message="Task queued")
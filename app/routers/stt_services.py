@@ -4,25 +4,34 @@ This module provides API endpoints for speech-to-text services including transcr
 Alignment, diarization, and combining transcripts with diarization results.
 """
 
-import json
 from datetime import datetime
+from typing import List
 
-import pandas as pd
 from fastapi import (
     APIRouter,
-    BackgroundTasks,
     Depends,
     File,
     HTTPException,
     Query,
     UploadFile,
 )
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from ..audio import get_audio_duration, process_audio_file
+from ..audio import (
+    get_audio_duration,
+    is_silent,
+    process_audio_file_async,
+)
 from ..db import get_db_session
-from ..files import ALLOWED_EXTENSIONS, save_temporary_file, validate_extension
+from ..files import (
+    ALLOWED_EXTENSIONS,
+    JSON_EXTENSIONS,
+    save_temporary_file,
+    validate_extension,
+)
+from ..jobs import submit_job
 from ..logger import logger  # Import the logger from the new module
 from ..schemas import (
     AlignedTranscription,
@@ -34,7 +43,9 @@ from ..schemas import (
     Response,
     Transcript,
     VADOptions,
-    WhsiperModelParams,
+    WhisperModelParams,
+    async_dependency,
+    task_queued_response,
 )
 from ..services import (
     process_alignment,
@@ -42,12 +53,15 @@ from ..services import (
     process_speaker_assignment,
     process_transcribe,
 )
-from ..tasks import add_task_to_db
+from ..tasks import add_task_to_db, update_task_status_in_db
 from ..transcript import filter_aligned_transcription
 from ..whisperx_services import device
 
 service_router = APIRouter()
 
+# Validates a whole list of diarization segments in a single call
+DIARIZATION_SEGMENTS_ADAPTER = TypeAdapter(List[DiarizationSegment])
+
 
 @service_router.post(
     "/service/transcribe",
@@ -55,10 +69,9 @@ service_router = APIRouter()
     name="1. Transcribe",
 )
 async def transcribe(
-    background_tasks: BackgroundTasks,
-    model_params: WhsiperModelParams = Depends(),
-    asr_options_params: ASROptions = Depends(),
-    vad_options_params: VADOptions = Depends(),
+    model_params: WhisperModelParams = Depends(async_dependency(WhisperModelParams)),
+    asr_options_params: ASROptions = Depends(async_dependency(ASROptions)),
+    vad_options_params: VADOptions = Depends(async_dependency(VADOptions)),
     file: UploadFile = File(..., description="Audio/video file to transcribe"),
     session: Session = Depends(get_db_session),
 ) -> Response:
@@ -66,8 +79,7 @@ async def transcribe(
     Transcribe an uploaded audio file.
 
     Args:
-        background_tasks (BackgroundTasks): Background tasks dependency.
-        model_params (WhsiperModelParams): Whisper model parameters.
+        model_params (WhisperModelParams): Whisper model parameters.
         asr_options_params (ASROptions): ASR options parameters.
         vad_options_params (VADOptions): VAD options parameters.
         file (UploadFile): Uploaded audio file.
@@ -80,10 +92,14 @@ async def transcribe(
 
     validate_extension(file.filename, ALLOWED_EXTENSIONS)
 
-    temp_file = save_temporary_file(file.file, file.filename)
-    audio = process_audio_file(temp_file)
+    temp_file = await run_in_threadpool(save_temporary_file, file.file, file.filename)
+    audio = await process_audio_file_async(temp_file)
 
-    identifier = add_task_to_db(
+    asr_options = asr_options_params.model_dump()
+    vad_options = vad_options_params.model_dump()
+
+    identifier = await run_in_threadpool(
+        add_task_to_db,
         status="processing",
         file_name=file.filename,
         audio_duration=get_audio_duration(audio),
@@ -91,25 +107,24 @@ async def transcribe(
         task_type="transcription",
         task_params={
             **model_params.model_dump(),
-            "asr_options": asr_options_params.model_dump(),
-            "vad_options": vad_options_params.model_dump(),
+            "asr_options": asr_options,
+            "vad_options": vad_options,
         },
-        start_time=datetime.utcnow(),
         session=session,
     )
 
-    background_tasks.add_task(
+    submit_job(
+        identifier,
         process_transcribe,
         audio,
         identifier,
         model_params,
-        asr_options_params,
-        vad_options_params,
-        session,
+        asr_options,
+        vad_options,
     )
 
     logger.info("Background task scheduled for processing: ID %s", identifier)
-    return Response(identifier=identifier, message="Task queued")
+    return task_queued_response(identifier)
 
 
 @service_router.post(
@@ -117,8 +132,7 @@ async def transcribe(
     tags=["Speech-2-Text services"],
     name="2. Align Transcript",
 )
-def align(
-    background_tasks: BackgroundTasks,
+async def align(
     transcript: UploadFile = File(
         ..., description="Whisper style transcript json file"
     ),
@@ -129,14 +143,13 @@ def align(
         default=device,
         description="Device to use for PyTorch inference",
     ),
-    align_params: AlignmentParams = Depends(),
+    align_params: AlignmentParams = Depends(async_dependency(AlignmentParams)),
     session: Session = Depends(get_db_session),
 ) -> Response:
     """
     Align a transcript with an audio file.
 
     Args:
-        background_tasks (BackgroundTasks): Background tasks dependency.
         transcript (UploadFile): Uploaded transcript file.
         file (UploadFile): Uploaded audio file.
         device (Device): Device for PyTorch inference.
@@ -152,21 +165,24 @@ def align(
         transcript.filename,
     )
 
-    validate_extension(transcript.filename, {".json"})
+    validate_extension(transcript.filename, JSON_EXTENSIONS)
 
     try:
         # Read the content of the transcript file
-        transcript = Transcript(**json.loads(transcript.file.read()))
+        transcript = await run_in_threadpool(
+            Transcript.model_validate_json, await transcript.read()
+        )
     except ValidationError as e:
         logger.error("Invalid JSON content in transcript file: %s", str(e))
         raise HTTPException(status_code=400, detail=f"Invalid JSON content. {str(e)}")
 
     validate_extension(file.filename, ALLOWED_EXTENSIONS)
 
-    temp_file = save_temporary_file(file.file, file.filename)
-    audio = process_audio_file(temp_file)
+    temp_file = await run_in_threadpool(save_temporary_file, file.file, file.filename)
+    audio = await process_audio_file_async(temp_file)
 
-    identifier = add_task_to_db(
+    identifier = await run_in_threadpool(
+        add_task_to_db,
         status="processing",
         file_name=file.filename,
         audio_duration=get_audio_duration(audio),
@@ -176,58 +192,57 @@ def align(
             **align_params.model_dump(),
             "device": device,
         },
-        start_time=datetime.utcnow(),
         session=session,
     )
 
-    background_tasks.add_task(
+    submit_job(
+        identifier,
         process_alignment,
         audio,
-        transcript.model_dump(),
+        transcript,
         identifier,
         device,
         align_params,
-        session,
     )
 
     logger.info("Background task scheduled for processing: ID %s", identifier)
-    return Response(identifier=identifier, message="Task queued")
+    return task_queued_response(identifier)
 
 
 @service_router.post(
     "/service/diarize", tags=["Speech-2-Text services"], name="3. Diarize"
 )
 async def diarize(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     session: Session = Depends(get_db_session),
     device: Device = Query(
         default=device,
         description="Device to use for PyTorch inference",
     ),
-    diarize_params: DiarizationParams = Depends(),
+    diarize_params: DiarizationParams = Depends(async_dependency(DiarizationParams)),
 ) -> Response:
     """
     Perform diarization on an uploaded audio file.
 
     Args:
-        background_tasks (BackgroundTasks): Background tasks dependency.
         file (UploadFile): Uploaded audio file.
         session (Session): Database session dependency.
         device (Device): Device for PyTorch inference.
         diarize_params (DiarizationParams): Diarization parameters.
 
     Returns:
-        Response: Confirmation message of task queuing.
+        Response: Confirmation message of task queuing, or of its completion
+            when the audio is silent.
     """
     logger.info("Received diarization request for file: %s", file.filename)
 
     validate_extension(file.filename, ALLOWED_EXTENSIONS)
 
-    temp_file = save_temporary_file(file.file, file.filename)
-    audio = process_audio_file(temp_file)
+    temp_file = await run_in_threadpool(save_temporary_file, file.file, file.filename)
+    audio = await process_audio_file_async(temp_file)
 
-    identifier = add_task_to_db(
+    identifier = await run_in_threadpool(
+        add_task_to_db,
         # identifier=identifier,
         status="processing",
         file_name=file.filename,
@@ -237,20 +252,40 @@ async def diarize(
             **diarize_params.model_dump(),
             "device": device,
         },
-        start_time=datetime.utcnow(),
         session=session,
     )
-    background_tasks.add_task(
+
+    if is_silent(audio):
+        # Nothing to diarize, complete the task without loading the pipeline
+        now = datetime.now()
+        await run_in_threadpool(
+            update_task_status_in_db,
+            identifier=identifier,
+            update_data={
+                "status": "completed",
+                "result": [],
+                "duration": 0,
+                "start_time": now,
+                "end_time": now,
+            },
+            session=session,
+        )
+        logger.info(
+            "No speech energy in audio, diarization skipped: ID %s", identifier
+        )
+        return Response(identifier=identifier, message="Task completed, no speech")
+
+    submit_job(
+        identifier,
         process_diarize,
         audio,
         identifier,
         device,
         diarize_params,
-        session,
     )
 
     logger.info("Background task scheduled for processing: ID %s", identifier)
-    return Response(identifier=identifier, message="Task queued")
+    return task_queued_response(identifier)
 
 
 @service_router.post(
@@ -259,7 +294,6 @@ async def diarize(
     name="4. Combine Transcript and Diarization result",
 )
 async def combine(
-    background_tasks: BackgroundTasks,
     aligned_transcript: UploadFile = File(...),
     diarization_result: UploadFile = File(...),
     session: Session = Depends(get_db_session),
@@ -268,7 +302,6 @@ async def combine(
     Combine a transcript with diarization results.
 
     Args:
-        background_tasks (BackgroundTasks): Background tasks dependency.
         aligned_transcript (UploadFile): Uploaded aligned transcript file.
         diarization_result (UploadFile): Uploaded diarization result file.
         session (Session): Database session dependency.
@@ -282,40 +315,42 @@ async def combine(
         diarization_result.filename,
     )
 
-    validate_extension(aligned_transcript.filename, {".json"})
-    validate_extension(diarization_result.filename, {".json"})
+    validate_extension(aligned_transcript.filename, JSON_EXTENSIONS)
+    validate_extension(diarization_result.filename, JSON_EXTENSIONS)
 
     try:
         # Read the content of the transcript file
-        transcript = AlignedTranscription(**json.loads(aligned_transcript.file.read()))
+        transcript = await run_in_threadpool(
+            AlignedTranscription.model_validate_json, await aligned_transcript.read()
+        )
         # removing words within each segment that have missing start, end, or score values
-        transcript = filter_aligned_transcription(transcript)
+        transcript = await run_in_threadpool(filter_aligned_transcription, transcript)
     except ValidationError as e:
         logger.error("Invalid JSON content in aligned transcript file: %s", str(e))
         raise HTTPException(status_code=400, detail=f"Invalid JSON content. {str(e)}")
     try:
         # Map JSON to list of models
-        diarization_segments = []
-        for item in json.loads(diarization_result.file.read()):
-            diarization_segments.append(DiarizationSegment(**item))
+        diarization_segments = await run_in_threadpool(
+            DIARIZATION_SEGMENTS_ADAPTER.validate_json, await diarization_result.read()
+        )
     except ValidationError as e:
         logger.error("Invalid JSON content in diarization result file: %s", str(e))
         raise HTTPException(status_code=400, detail=f"Invalid JSON content. {str(e)}")
 
-    identifier = add_task_to_db(
+    identifier = await run_in_threadpool(
+        add_task_to_db,
         status="processing",
         file_name=None,
         task_type="combine_transcript&diarization",
-        start_time=datetime.utcnow(),
         session=session,
     )
-    background_tasks.add_task(
+    submit_job(
+        identifier,
         process_speaker_assignment,
-        pd.json_normalize([segment.model_dump() for segment in diarization_segments]),
-        transcript.model_dump(),
+        diarization_segments,
+        transcript,
         identifier,
-        session,
     )
 
     logger.info("Background task scheduled for processing: ID %s", identifier)
-    return Response(identifier=identifier, message="Task queued")
+    return task_queued_response(identifier)
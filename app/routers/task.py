@@ -1,51 +1,182 @@
 """This module contains the task management routes for the FastAPI application."""
 
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+from typing import List
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import Response as HTTPResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from ..db import get_db_session
 from ..logger import logger  # Import the logger from the new module
 from ..schemas import Response, Result, ResultTasks
 from ..tasks import (
+    TASK_STATUS_BATCH_LIMIT,
+    TERMINAL_STATUSES,
     delete_task_from_db,
     get_all_tasks_status_from_db,
     get_task_status_from_db,
+    get_tasks_status_from_db,
+    iter_all_tasks_status_from_db,
 )
 
 task_router = APIRouter()
 
 
-@task_router.get("/task/all", tags=["Tasks Management"])
-async def get_all_tasks_status(
+def task_status_etag(identifier, status):
+    """
+    Build the ETag of a task status.
+
+    While a task runs only its status and audio duration change, the result,
+    error and end time are written together with the final status. Tasks still
+    in progress get a weak ETag, finished ones a strong one.
+
+    Args:
+        identifier (str): The identifier of the task.
+        status (dict): The task status.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    metadata = status["metadata"]
+    digest = hashlib.blake2b(
+        f"{identifier}:{status['status']}:{metadata['audio_duration']}:"
+        f"{metadata['end_time']}".encode(),
+        digest_size=8,
+    ).hexdigest()
+    if status["status"] in TERMINAL_STATUSES:
+        return f'"{digest}"'
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Check whether an If-None-Match header matches an ETag.
+
+    The header is either "*" or a comma-separated list of ETags, compared
+    with the weak comparison If-None-Match uses, which ignores the W/ prefix.
+
+    Args:
+        if_none_match (str): The If-None-Match header, or None if it is missing.
+        etag (str): The quoted ETag of the task status.
+
+    Returns:
+        bool: True if the header matches the ETag.
+    """
+    if if_none_match is None:
+        return False
+    opaque_tag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque_tag:
+            return True
+    return False
+
+
+@task_router.get("/task/all", tags=["Tasks Management"], response_model=ResultTasks)
+def get_all_tasks_status(
     session: Session = Depends(get_db_session),
-) -> ResultTasks:
+) -> HTTPResponse:
     """
     Retrieve the status of all tasks.
 
+    The ResultTasks model is serialized directly by pydantic-core, bypassing
+    FastAPI's jsonable_encoder and response model revalidation.
+
     Args:
         session (Session): Database session dependency.
 
     Returns:
-        ResultTasks: The status of all tasks.
+        HTTPResponse: The status of all tasks.
     """
     logger.info("Retrieving status of all tasks")
-    return get_all_tasks_status_from_db(session)
+    return HTTPResponse(
+        content=get_all_tasks_status_from_db(session).model_dump_json(),
+        media_type="application/json",
+    )
 
 
-@task_router.get("/task/{identifier}", tags=["Tasks Management"])
-async def get_transcription_status(
+@task_router.get("/task/all.ndjson", tags=["Tasks Management"])
+def stream_all_tasks_status() -> StreamingResponse:
+    """
+    Stream the status of all tasks as newline-delimited JSON, one task per line.
+
+    Tasks are read and sent in batches, so memory use does not grow with the
+    number of tasks and clients can process the first ones straight away.
+
+    Returns:
+        StreamingResponse: The status of all tasks.
+    """
+    logger.info("Streaming status of all tasks")
+    return StreamingResponse(
+        (orjson.dumps(task) + b"\n" for task in iter_all_tasks_status_from_db()),
+        media_type="application/x-ndjson",
+    )
+
+
+@task_router.get("/task", tags=["Tasks Management"])
+def get_tasks_status(
+    ids: List[str] = Query(
+        ...,
+        description="Identifiers of the tasks, repeated or comma-separated",
+    ),
+    session: Session = Depends(get_db_session),
+) -> ORJSONResponse:
+    """
+    Retrieve the status of several tasks at once.
+
+    Prefer this to polling each task separately, as all the tasks are read
+    with a single database query. Unknown identifiers are left out.
+
+    Args:
+        ids (List[str]): The identifiers of the tasks.
+        session (Session): Database session dependency.
+
+    Returns:
+        ORJSONResponse: The status of each task, keyed by its identifier.
+
+    Raises:
+        HTTPException: If too many identifiers are requested.
+    """
+    identifiers = [
+        identifier for value in ids for identifier in value.split(",") if identifier
+    ]
+    if len(identifiers) > TASK_STATUS_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {TASK_STATUS_BATCH_LIMIT} identifiers can be requested",
+        )
+    logger.info("Retrieving status for %d tasks", len(identifiers))
+    return ORJSONResponse(get_tasks_status_from_db(identifiers, session))
+
+
+@task_router.get(
+    "/task/{identifier}",
+    tags=["Tasks Management"],
+    response_model=Result,
+)
+def get_transcription_status(
     identifier: str,
+    request: Request,
     session: Session = Depends(get_db_session),
-) -> Result:
+) -> HTTPResponse:
     """
     Retrieve the status of a specific task by its identifier.
 
+    The status is read straight from the database, so it is serialized
+    without being validated against the Result model again. Every status
+    carries an ETag, and a matching If-None-Match header gets an empty
+    304 Not Modified instead of the whole status.
+
     Args:
         identifier (str): The identifier of the task.
+        request (Request): The incoming request.
         session (Session): Database session dependency.
 
     Returns:
-        Result: The status of the task.
+        HTTPResponse: The status of the task.
 
     Raises:
         HTTPException: If the identifier is not found.
@@ -55,14 +186,22 @@ async def get_transcription_status(
 
     if status is not None:
         logger.info("Status retrieved for task ID: %s", identifier)
-        return status
+        etag = task_status_etag(identifier, status)
+        if status["status"] in TERMINAL_STATUSES:
+            cache_control = "public, max-age=1"
+        else:
+            cache_control = "no-cache"
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return HTTPResponse(status_code=304, headers=headers)
+        return ORJSONResponse(status, headers=headers)
     else:
         logger.error("Task ID not found: %s", identifier)
         raise HTTPException(status_code=404, detail="Identifier not found")
 
 
 @task_router.delete("/task/{identifier}/delete", tags=["Tasks Management"])
-async def delete_task(
+def delete_task(
     identifier: str,
     session: Session = Depends(get_db_session),
 ) -> Response:
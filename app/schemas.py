@@ -1,29 +1,91 @@
 """This module contains the schema definitions for the WhisperX FastAPI application."""
 
+import inspect
 import os
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 from typing import Any, List, Optional
 
-import numpy as np
 from fastapi import Query
-from pydantic import BaseModel, Field, field_validator
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from whisperx import utils
 
+from .config import Config
+
 WHISPER_MODEL = os.getenv("WHISPER_MODEL")
 LANG = os.getenv("DEFAULT_LANG", "en")
 
 
+@lru_cache(maxsize=64)
+def parse_token_ids(value: str) -> tuple:
+    """
+    Parse a comma-separated string of token IDs, memoized for repeated values.
+
+    Args:
+        value (str): Comma-separated token IDs, e.g. "-1".
+
+    Returns:
+        tuple: The token IDs as integers.
+    """
+    return tuple(int(x) for x in value.split(","))
+
+
+@lru_cache(maxsize=None)
+def async_dependency(model):
+    """
+    Wrap a parameter model in a coroutine function for use with Depends.
+
+    FastAPI runs class dependencies in its threadpool, although building these
+    models only validates query parameters; the wrapper has the same signature
+    as the model, so FastAPI builds it on the event loop instead.
+
+    Args:
+        model (type): The parameter model.
+
+    Returns:
+        Callable: Coroutine function returning an instance of the model.
+    """
+
+    async def dependency(**params):
+        return model(**params)
+
+    dependency.__signature__ = inspect.signature(model)
+    return dependency
+
+
 class Response(BaseModel):
     """Response model for API responses."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     identifier: str
     message: str
 
 
+def task_queued_response(identifier):
+    """
+    Build the confirmation returned once a task is queued.
+
+    The body always has the shape of the Response model, so it is encoded
+    directly instead of being validated and serialized through the model.
+
+    Args:
+        identifier (str): The identifier of the queued task.
+
+    Returns:
+        ORJSONResponse: Confirmation message of task queuing.
+    """
+    return ORJSONResponse({"identifier": identifier, "message": "Task queued"})
+
+
 class Metadata(BaseModel):
     """Metadata model for task information."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     task_type: str
     task_params: Optional[dict]
     language: Optional[str]
@@ -38,6 +100,8 @@ class Metadata(BaseModel):
 class TaskSimple(BaseModel):
     """Simple task model with basic task information."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     identifier: str
     status: str
     task_type: str
@@ -134,6 +198,7 @@ class ComputeType(str, Enum):
     float16 = "float16"
     float32 = "float32"
     int8 = "int8"
+    int8_float16 = "int8_float16"
 
 
 class WhisperModel(str, Enum):
@@ -252,7 +317,7 @@ class ASROptions(BaseModel):
     def parse_suppress_tokens(cls, value):
         """Parse suppress tokens from a comma-separated string of token IDs into a list of integers."""
         if isinstance(value, str):
-            return [int(x) for x in value.split(",")]
+            return list(parse_token_ids(value))
         return value
 
 
@@ -273,7 +338,7 @@ class VADOptions(BaseModel):
     )
 
 
-class WhsiperModelParams(BaseModel):
+class WhisperModelParams(BaseModel):
     """Model for Whisper model parameters."""
 
     language: str = Field(
@@ -320,7 +385,7 @@ class WhsiperModelParams(BaseModel):
         )
     )
     compute_type: ComputeType = Field(
-        Query("float16", description="Type of computation")
+        Query(Config.COMPUTE_TYPE, description="Type of computation")
     )
 
 
@@ -353,20 +418,29 @@ class DiarizationParams(BaseModel):
     max_speakers: Optional[int] = Field(
         Query(None, description="Maximum number of speakers to in audio file")
     )
+    embedding_batch_size: int = Field(
+        Query(
+            8,
+            ge=1,
+            description="Batch size used to compute speaker embeddings, "
+            "reduce it on low-memory GPUs",
+        )
+    )
 
 
-class SpeechToTextProcessingParams(BaseModel):
-    """Model for speech-to-text processing parameters."""
+@dataclass(slots=True)
+class SpeechToTextProcessingParams:
+    """
+    Speech-to-text processing parameters handed to the background task.
 
-    audio: np.ndarray  # NumPy array containing the audio waveform, float32 dtype
+    A plain dataclass rather than a model: the nested parameter models are
+    validated at the HTTP boundary and are not validated again here.
+    """
+
+    audio_file: str  # Path to the uploaded audio or video file, decoded by the task
     identifier: str
     vad_options: VADOptions
     asr_options: ASROptions
-    whisper_model_params: WhsiperModelParams
+    whisper_model_params: WhisperModelParams
     alignment_params: AlignmentParams
     diarization_params: DiarizationParams
-
-    class Config:
-        """Configuration for the SpeechToTextProcessingParams model."""
-
-        arbitrary_types_allowed = True
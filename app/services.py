@@ -2,18 +2,14 @@
 
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
 import whisperx
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from .logger import logger  # Import the logger from the new module
-from .schemas import (
-    AlignmentParams,
-    ASROptions,
-    DiarizationParams,
-    VADOptions,
-    WhsiperModelParams,
-)
+from .schemas import AlignmentParams, DiarizationParams, WhisperModelParams
 from .tasks import update_task_status_in_db
 from .whisperx_services import align_whisper_output, diarize, transcribe_with_whisper
 
@@ -101,9 +97,9 @@ def process_audio_task(
 def process_transcribe(
     audio,
     identifier,
-    model_params: WhsiperModelParams,
-    asr_options_params: ASROptions,
-    vad_options_params: VADOptions,
+    model_params: WhisperModelParams,
+    asr_options: dict,
+    vad_options: dict,
     session: Session,
 ):
     """
@@ -112,9 +108,9 @@ def process_transcribe(
     Args:
         audio: The audio data.
         identifier (str): The task identifier.
-        model_params (WhsiperModelParams): The model parameters.
-        asr_options_params (ASROptions): The ASR options.
-        vad_options_params (VADOptions): The VAD options.
+        model_params (WhisperModelParams): The model parameters.
+        asr_options (dict): The dumped ASR options.
+        vad_options (dict): The dumped VAD options.
         session (Session): The database session.
     """
     process_audio_task(
@@ -124,8 +120,8 @@ def process_transcribe(
         session,
         audio,
         model_params.task.value,
-        asr_options_params.model_dump(),
-        vad_options_params.model_dump(),
+        asr_options,
+        vad_options,
         model_params.language,
         model_params.batch_size,
         model_params.chunk_size,
@@ -163,6 +159,7 @@ def process_diarize(
         device,
         diarize_params.min_speakers,
         diarize_params.max_speakers,
+        diarize_params.embedding_batch_size,
     )
 
 
@@ -177,9 +174,12 @@ def process_alignment(
     """
     Process a transcription alignment task.
 
+    The transcript is dumped here, in the background task, rather than in
+    the request handler.
+
     Args:
         audio: The audio data.
-        transcript: The transcript data.
+        transcript (Transcript): The validated transcript.
         identifier (str): The task identifier.
         device: The device to use.
         align_params (AlignmentParams): The alignment parameters.
@@ -190,9 +190,9 @@ def process_alignment(
         identifier,
         "transcription_alignment",
         session,
-        transcript["segments"],
+        transcript.model_dump()["segments"],
         audio,
-        transcript["language"],
+        transcript.language,
         device,
         align_params.align_model,
         align_params.interpolate_method,
@@ -200,6 +200,35 @@ def process_alignment(
     )
 
 
+def diarization_segments_to_dataframe(diarization_segments):
+    """
+    Build the diarization DataFrame column by column from validated segments.
+
+    Args:
+        diarization_segments (list[DiarizationSegment]): The diarization segments.
+
+    Returns:
+        pd.DataFrame: The segments with label, speaker, start and end columns.
+    """
+    count = len(diarization_segments)
+    return pd.DataFrame(
+        {
+            "label": [segment.label for segment in diarization_segments],
+            "speaker": [segment.speaker for segment in diarization_segments],
+            "start": np.fromiter(
+                (segment.start for segment in diarization_segments),
+                dtype=np.float64,
+                count=count,
+            ),
+            "end": np.fromiter(
+                (segment.end for segment in diarization_segments),
+                dtype=np.float64,
+                count=count,
+            ),
+        }
+    )
+
+
 def process_speaker_assignment(
     diarization_segments,
     transcript,
@@ -210,8 +239,8 @@ def process_speaker_assignment(
     Process a speaker assignment task.
 
     Args:
-        diarization_segments: The diarization segments.
-        transcript: The transcript data.
+        diarization_segments (list[DiarizationSegment]): The diarization segments.
+        transcript (AlignedTranscription): The validated aligned transcript.
         identifier (str): The task identifier.
         session (Session): The database session.
     """
@@ -220,6 +249,6 @@ def process_speaker_assignment(
         identifier,
         "combine_transcript&diarization",
         session,
-        diarization_segments,
-        transcript,
+        diarization_segments_to_dataframe(diarization_segments),
+        transcript.model_dump(),
     )
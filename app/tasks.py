@@ -1,13 +1,258 @@
 """This module contains functions to interact with the task database."""
 
+import time
+from collections import OrderedDict
+from itertools import count
+from threading import Lock
 from typing import Any, Dict
 
+import orjson
 from fastapi import Depends
+from sqlalchemy import Text, bindparam, func, insert, select, type_coerce
 from sqlalchemy.orm import Session
 
-from .db import get_db_session, handle_database_errors
-from .models import Task
-from .schemas import ResultTasks, TaskSimple
+from .config import Config
+from .db import SessionLocal, get_db_session, handle_database_errors
+from .models import Task, uuid7
+from .schemas import ResultTasks
+
+# Tasks in these states are never updated again, so their status is cached longer
+TERMINAL_STATUSES = frozenset({"completed", "failed"})
+TASK_STATUS_CACHE_SIZE = 1024
+# Statuses hold the full result JSON, so the cache is also bounded by its total size
+TASK_STATUS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Tasks whose last invalidation is remembered, older ones share the floor generation
+TASK_STATUS_GENERATIONS_SIZE = 4096
+# Rows fetched from the database at a time when streaming all tasks
+TASKS_STREAM_BATCH_SIZE = 500
+
+_task_status_cache: "OrderedDict[str, tuple[float, int, dict]]" = OrderedDict()
+_task_status_cache_bytes = 0
+_task_status_cache_lock = Lock()
+# Bumped when a task is invalidated, so a status read before an update or a
+# delete committed is not cached after it
+_task_status_generations: "OrderedDict[str, int]" = OrderedDict()
+_task_status_generation_floor = 0
+_task_status_generation_counter = count(1)
+
+# Built once so every new task reuses the same statement and its compiled SQL,
+# the start time is stamped by the database
+INSERT_TASK_STATEMENT = insert(Task).values(start_time=func.now())
+
+# The result is read as its stored JSON text, see json_fragment
+TASK_STATUS_SELECT = select(
+    Task.uuid,
+    Task.status,
+    type_coerce(Task.result, Text).label("result"),
+    Task.task_type,
+    Task.task_params,
+    Task.language,
+    Task.file_name,
+    Task.url,
+    Task.duration,
+    Task.audio_duration,
+    Task.start_time,
+    Task.end_time,
+    Task.error,
+)
+TASK_STATUS_STATEMENT = TASK_STATUS_SELECT.where(Task.uuid == bindparam("identifier"))
+# Most identifiers looked up by a single batch status query
+TASK_STATUS_BATCH_LIMIT = 500
+
+# Only the columns TaskSimple serializes, labelled with its field names
+ALL_TASKS_STATEMENT = select(
+    Task.uuid.label("identifier"),
+    Task.status,
+    Task.task_type,
+)
+
+
+def json_fragment(raw):
+    """
+    Wrap stored JSON text so orjson embeds it in a response without decoding it.
+
+    Args:
+        raw: The JSON text of a column, or a value the driver already decoded.
+
+    Returns:
+        The JSON fragment, or the decoded value unchanged.
+    """
+    if isinstance(raw, (str, bytes)):
+        return orjson.Fragment(raw)
+    return raw
+
+
+def task_status_from_row(task):
+    """
+    Build the status of a task from a row of TASK_STATUS_SELECT.
+
+    Args:
+        task (Row): The task row.
+
+    Returns:
+        dict: Dictionary containing the task status and metadata.
+    """
+    return {
+        "status": task.status,
+        "result": json_fragment(task.result),
+        "metadata": {
+            "task_type": task.task_type,
+            "task_params": task.task_params,
+            "language": task.language,
+            "file_name": task.file_name,
+            "url": task.url,
+            "duration": task.duration,
+            "audio_duration": task.audio_duration,
+            "start_time": task.start_time,
+            "end_time": task.end_time,
+        },
+        "error": task.error,
+    }
+
+
+def json_size(raw):
+    """
+    Get the size of a stored JSON value, used to bound the status cache.
+
+    Args:
+        raw: The JSON text of a column, or a value the driver already decoded.
+
+    Returns:
+        int: The size of the JSON text in bytes.
+    """
+    if raw is None:
+        return 0
+    if isinstance(raw, (str, bytes)):
+        return len(raw)
+    return len(orjson.dumps(raw, option=orjson.OPT_SERIALIZE_NUMPY))
+
+
+def _drop_cached_task_status(identifier):
+    """
+    Remove a task from the status cache, the caller holds the cache lock.
+
+    Args:
+        identifier (str): Identifier of the task.
+    """
+    global _task_status_cache_bytes
+    entry = _task_status_cache.pop(identifier, None)
+    if entry is not None:
+        _task_status_cache_bytes -= entry[1]
+
+
+def _task_status_generation(identifier):
+    """
+    Get the generation of a task, the caller holds the cache lock.
+
+    Args:
+        identifier (str): Identifier of the task.
+
+    Returns:
+        int: The generation of the task.
+    """
+    return _task_status_generations.get(identifier, _task_status_generation_floor)
+
+
+def get_task_status_generation(identifier):
+    """
+    Get the generation of a task, read before querying its status.
+
+    Args:
+        identifier (str): Identifier of the task.
+
+    Returns:
+        int: The generation to pass to cache_task_status.
+    """
+    with _task_status_cache_lock:
+        return _task_status_generation(identifier)
+
+
+def get_cached_task_status(identifier):
+    """
+    Get the cached status of a task.
+
+    Args:
+        identifier (str): Identifier of the task.
+
+    Returns:
+        dict: The cached task status, or None if it is not cached or has expired.
+    """
+    with _task_status_cache_lock:
+        entry = _task_status_cache.get(identifier)
+        if entry is None:
+            return None
+        expires_at, _, status = entry
+        if expires_at < time.monotonic():
+            _drop_cached_task_status(identifier)
+            return None
+        _task_status_cache.move_to_end(identifier)
+        return status
+
+
+def cache_task_status(identifier, status, size, generation):
+    """
+    Cache the status of a task.
+
+    Tasks still in progress are cached for CACHE_TTL_PROCESSING seconds, which
+    bounds how stale a poll can be, finished ones for CACHE_TTL_DONE seconds.
+    Expired entries are swept on every insert, then the least recently used
+    ones are evicted until the cache fits its entry and byte limits.
+
+    The status is not cached if the task was invalidated since its generation
+    was read, as it may then have been queried before the change committed.
+
+    Args:
+        identifier (str): Identifier of the task.
+        status (dict): Task status as returned by get_task_status_from_db.
+        size (int): Size of the result JSON of the task in bytes.
+        generation (int): Generation of the task read before querying its status.
+    """
+    global _task_status_cache_bytes
+    if status["status"] in TERMINAL_STATUSES:
+        ttl = Config.CACHE_TTL_DONE
+    else:
+        ttl = Config.CACHE_TTL_PROCESSING
+    if ttl <= 0 or size > TASK_STATUS_CACHE_MAX_BYTES:
+        return
+    now = time.monotonic()
+    with _task_status_cache_lock:
+        if _task_status_generation(identifier) != generation:
+            return
+        _drop_cached_task_status(identifier)
+        expired = [
+            key
+            for key, (expires_at, _, _) in _task_status_cache.items()
+            if expires_at < now
+        ]
+        for key in expired:
+            _drop_cached_task_status(key)
+        _task_status_cache[identifier] = (now + ttl, size, status)
+        _task_status_cache_bytes += size
+        while (
+            len(_task_status_cache) > TASK_STATUS_CACHE_SIZE
+            or _task_status_cache_bytes > TASK_STATUS_CACHE_MAX_BYTES
+        ):
+            _drop_cached_task_status(next(iter(_task_status_cache)))
+
+
+def invalidate_task_status(identifier):
+    """
+    Remove a task from the status cache and bump its generation.
+
+    Args:
+        identifier (str): Identifier of the task.
+    """
+    global _task_status_generation_floor
+    with _task_status_cache_lock:
+        _drop_cached_task_status(identifier)
+        _task_status_generations.pop(identifier, None)
+        _task_status_generations[identifier] = next(_task_status_generation_counter)
+        while len(_task_status_generations) > TASK_STATUS_GENERATIONS_SIZE:
+            # Forgotten tasks fall back to the floor, which is then newer than
+            # any generation read before they were last invalidated
+            _, _task_status_generation_floor = _task_status_generations.popitem(
+                last=False
+            )
 
 
 # Add tasks to the database
@@ -21,12 +266,12 @@ def add_task_to_db(
     file_name=None,
     url=None,
     audio_duration=None,
-    start_time=None,
-    end_time=None,
 ):
     """
     Add a new task to the database.
 
+    The start time of the task is set by the database.
+
     Args:
         session (Session): Database session.
         status (str): Status of the task.
@@ -36,26 +281,27 @@ def add_task_to_db(
         file_name (str, optional): Name of the file associated with the task. Defaults to None.
         url (str, optional): URL associated with the task. Defaults to None.
         audio_duration (float, optional): Duration of the audio file. Defaults to None.
-        start_time (datetime, optional): Start time of the task. Defaults to None.
-        end_time (datetime, optional): End time of the task. Defaults to None.
 
     Returns:
         str: UUID of the newly created task.
     """
-    task = Task(
-        status=status,
-        language=language,
-        file_name=file_name,
-        url=url,
-        task_type=task_type,
-        task_params=task_params,
-        audio_duration=audio_duration,
-        start_time=start_time,
-        end_time=end_time,
+    # The UUID is generated here, so no RETURNING is needed to read it back
+    identifier = uuid7()
+    session.execute(
+        INSERT_TASK_STATEMENT,
+        {
+            "uuid": identifier,
+            "status": status,
+            "language": language,
+            "file_name": file_name,
+            "url": url,
+            "task_type": task_type,
+            "task_params": task_params,
+            "audio_duration": audio_duration,
+        },
     )
-    session.add(task)
     session.commit()
-    return task.uuid
+    return identifier
 
 
 # Update task status in the database
@@ -81,6 +327,8 @@ def update_task_status_in_db(
         for key, value in update_data.items():
             setattr(task, key, value)
         session.commit()
+    # After the commit, a status read before it then fails its generation check
+    invalidate_task_status(identifier)
 
 
 # Retrieve task status from the database
@@ -89,6 +337,9 @@ def get_task_status_from_db(identifier, session: Session = Depends(get_db_sessio
     """
     Retrieve the status of a task from the database.
 
+    The result, usually the largest part of the status, is kept as the JSON
+    text it was stored as and is spliced into responses as is.
+
     Args:
         identifier (str): Identifier of the task.
         session (Session, optional): Database session. Defaults to Depends(get_db_session).
@@ -96,55 +347,89 @@ def get_task_status_from_db(identifier, session: Session = Depends(get_db_sessio
     Returns:
         dict: Dictionary containing the task status and metadata if the task exists, otherwise None.
     """
-    task = session.query(Task).filter(Task.uuid == identifier).first()
+    cached_status = get_cached_task_status(identifier)
+    if cached_status is not None:
+        return cached_status
+
+    generation = get_task_status_generation(identifier)
+    task = session.execute(TASK_STATUS_STATEMENT, {"identifier": identifier}).first()
     if task:
-        return {
-            "status": task.status,
-            "result": task.result,
-            "metadata": {
-                "task_type": task.task_type,
-                "task_params": task.task_params,
-                "language": task.language,
-                "file_name": task.file_name,
-                "url": task.url,
-                "duration": task.duration,
-                "audio_duration": task.audio_duration,
-                "start_time": task.start_time,
-                "end_time": task.end_time,
-            },
-            "error": task.error,
-        }
+        status = task_status_from_row(task)
+        cache_task_status(identifier, status, json_size(task.result), generation)
+        return status
     else:
         return None
 
 
+@handle_database_errors
+def get_tasks_status_from_db(identifiers, session: Session):
+    """
+    Retrieve the status of several tasks, querying the database once for all of them.
+
+    Args:
+        identifiers (list): Identifiers of the tasks.
+        session (Session): Database session.
+
+    Returns:
+        dict: The status of each task that exists, keyed by its identifier.
+    """
+    statuses = {}
+    missing = []
+    for identifier in dict.fromkeys(identifiers):
+        cached_status = get_cached_task_status(identifier)
+        if cached_status is None:
+            missing.append(identifier)
+        else:
+            statuses[identifier] = cached_status
+
+    if missing:
+        generations = {
+            identifier: get_task_status_generation(identifier) for identifier in missing
+        }
+        for task in session.execute(TASK_STATUS_SELECT.where(Task.uuid.in_(missing))):
+            status = task_status_from_row(task)
+            cache_task_status(
+                task.uuid, status, json_size(task.result), generations[task.uuid]
+            )
+            statuses[task.uuid] = status
+    return statuses
+
+
 # Retrieve task status from the database
 @handle_database_errors
 def get_all_tasks_status_from_db(session: Session = Depends(get_db_session)):
     """
     Retrieve the status of all tasks from the database.
 
+    The rows are plain tuples rather than ORM objects and the whole list is
+    validated in a single pass.
+
     Args:
         session (Session, optional): Database session. Defaults to Depends(get_db_session).
 
     Returns:
         ResultTasks: Object containing a list of all tasks with their status and type.
     """
-    tasks = []
-    # Define the columns you want to select
-    columns = [Task.uuid, Task.status, Task.task_type]
-
-    # Create a query to select only the specified columns
-    query = session.query(*columns)
-    for task in query:
-        tasks.append(
-            TaskSimple(
-                identifier=task.uuid,
-                status=task.status,
-                task_type=task.task_type,
-            )
-        )
-    return ResultTasks(tasks=tasks)
+    rows = session.execute(ALL_TASKS_STATEMENT).all()
+    return ResultTasks.model_validate({"tasks": rows}, from_attributes=True)
+
+
+def iter_all_tasks_status_from_db():
+    """
+    Iterate over the status of all tasks, fetching them from the database in batches.
+
+    The generator opens its own session, as it is consumed after the request
+    handler has returned.
+
+    Yields:
+        dict: The identifier, status and type of a task.
+    """
+    statement = ALL_TASKS_STATEMENT.execution_options(
+        yield_per=TASKS_STREAM_BATCH_SIZE,
+    )
+    with SessionLocal() as session:
+        for row in session.execute(statement):
+            yield row._asdict()
 
 
 @handle_database_errors
@@ -166,6 +451,8 @@ def delete_task_from_db(identifier: str, session: Session):
         # If the task exists, delete it from the database
         session.delete(task)
         session.commit()
+        # After the commit, a status read before it then fails its generation check
+        invalidate_task_status(identifier)
         return True
     else:
         # If the task does not exist, return False
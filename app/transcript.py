@@ -40,3 +40,42 @@ def filter_aligned_transcription(
         segments=filtered_segments, word_segments=[]
     )
     return filtered_transcription
+
+
+def filter_aligned_transcription_dict(aligned_transcription: dict) -> dict:
+    """
+    Filter raw whisperX alignment output without building per-word models.
+
+    Produces the same structure as ``filter_aligned_transcription(...).model_dump()``
+    for trusted whisperX output, skipping pydantic validation of every word.
+
+    Args:
+        aligned_transcription (dict): The aligned transcription returned by whisperX.
+
+    Returns:
+        dict: Filtered aligned transcription with empty word segments.
+    """
+    filtered_segments = []
+    for segment in aligned_transcription["segments"]:
+        filtered_words = [
+            {
+                "word": word["word"],
+                "start": word["start"],
+                "end": word["end"],
+                "score": word["score"],
+            }
+            for word in segment["words"]
+            if word.get("start") is not None
+            and word.get("end") is not None
+            and word.get("score") is not None
+        ]
+        if filtered_words:
+            filtered_segments.append(
+                {
+                    "start": segment["start"],
+                    "end": segment["end"],
+                    "text": segment["text"],
+                    "words": filtered_words,
+                }
+            )
+    return {"segments": filtered_segments, "word_segments": []}
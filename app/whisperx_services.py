@@ -1,9 +1,13 @@
 """This module provides services for transcribing, diarizing, and aligning audio using Whisper and other models."""
 
 import gc
+import os
+from collections import OrderedDict
 from datetime import datetime
+from threading import Lock
 
 import torch
+from faster_whisper import WhisperModel
 from whisperx import (
     DiarizationPipeline,
     align,
@@ -12,11 +16,12 @@ from whisperx import (
     load_model,
 )
 
+from .audio import get_audio_duration, process_audio_file
 from .config import Config
 from .logger import logger  # Import the logger from the new module
-from .schemas import AlignedTranscription, SpeechToTextProcessingParams
+from .schemas import SpeechToTextProcessingParams
 from .tasks import update_task_status_in_db
-from .transcript import filter_aligned_transcription
+from .transcript import filter_aligned_transcription_dict
 
 LANG = Config.LANG
 HF_TOKEN = Config.HF_TOKEN
@@ -24,6 +29,205 @@ WHISPER_MODEL = Config.WHISPER_MODEL
 device = Config.DEVICE
 compute_type = Config.COMPUTE_TYPE
 
+MODEL_CACHE_SIZE = Config.MODEL_CACHE_SIZE
+
+# Loaded models keyed by (kind, *load parameters), least recently used first,
+# so repeated requests skip the model load
+_model_cache = OrderedDict()
+_model_cache_lock = Lock()
+# One lock per model being loaded, so only loads of the same model wait for each
+# other while the cache lock stays free for hits and flushes
+_model_load_locks = {}
+
+
+def evict_cached_models(size):
+    """
+    Evict the least recently used models until at most `size` remain.
+
+    The caller must hold the model cache lock.
+
+    Args:
+        size (int): The number of models to keep.
+
+    Returns:
+        bool: Whether any model was evicted.
+    """
+    evicted = False
+    while _model_cache and len(_model_cache) > size:
+        evicted_key, _ = _model_cache.popitem(last=False)
+        logger.debug("Evicting model from cache: %s", evicted_key)
+        evicted = True
+    return evicted
+
+
+def release_gpu_memory():
+    """Collect unreferenced models and return cached CUDA memory to the driver."""
+    gc.collect()
+    torch.cuda.empty_cache()
+
+
+def get_cached_model(kind, key, loader):
+    """
+    Return a cached model, loading it on a miss.
+
+    When the cache holds MODEL_CACHE_SIZE models, the least recently used
+    one is released before the new model is loaded. A size of 0 disables
+    caching. The model is loaded without holding the cache lock, concurrent
+    requests for the same model wait for a single load.
+
+    Args:
+        kind (str): The kind of model ("whisper", "align" or "diarize").
+        key (tuple): The parameters the model was loaded with.
+        loader (callable): Function loading the model when it is not cached.
+
+    Returns:
+        The cached or newly loaded model.
+    """
+    cache_key = (kind, *key)
+    with _model_cache_lock:
+        if cache_key in _model_cache:
+            _model_cache.move_to_end(cache_key)
+            return _model_cache[cache_key]
+        load_lock = _model_load_locks.setdefault(cache_key, Lock())
+
+    with load_lock:
+        with _model_cache_lock:
+            # Another request may have loaded it while this one waited
+            if cache_key in _model_cache:
+                _model_cache.move_to_end(cache_key)
+                return _model_cache[cache_key]
+            evicted = evict_cached_models(MODEL_CACHE_SIZE - 1)
+        if evicted:
+            release_gpu_memory()
+
+        try:
+            logger.debug("Loading %s model with key: %s", kind, key)
+            model = loader()
+            if MODEL_CACHE_SIZE > 0:
+                with _model_cache_lock:
+                    _model_cache[cache_key] = model
+                    # Other models may have been loaded at the same time
+                    evict_cached_models(MODEL_CACHE_SIZE)
+        finally:
+            with _model_cache_lock:
+                _model_load_locks.pop(cache_key, None)
+        return model
+
+
+def clear_model_cache():
+    """
+    Drop every cached model and release the GPU memory they held.
+
+    Returns:
+        int: The number of models removed from the cache.
+    """
+    with _model_cache_lock:
+        count = len(_model_cache)
+        _model_cache.clear()
+        release_gpu_memory()
+    logger.info("Flushed %d models from the model cache", count)
+    return count
+
+
+def get_whisper_model(model, device, device_index, compute_type, threads):
+    """
+    Get the cached faster-whisper model used by the transcription pipeline.
+
+    Args:
+        model (str): Name of the Whisper model.
+        device (str): Device to use for inference.
+        device_index (int): Device index to use for inference.
+        compute_type (str): Compute type for computation.
+        threads (int): Number of CPU threads used by faster-whisper.
+
+    Returns:
+        WhisperModel: The faster-whisper model.
+    """
+    return get_cached_model(
+        "whisper",
+        (model, device, device_index, compute_type, threads),
+        lambda: WhisperModel(
+            model,
+            device=device,
+            device_index=device_index,
+            compute_type=compute_type,
+            cpu_threads=threads,
+        ),
+    )
+
+
+def get_align_model(language_code, device, align_model=None):
+    """
+    Get the cached alignment model and its metadata.
+
+    Args:
+        language_code (str): The language code.
+        device (str): Device to use for inference.
+        align_model (str): Name of phoneme-level ASR model to do alignment.
+
+    Returns:
+        tuple: The alignment model and its metadata.
+    """
+    return get_cached_model(
+        "align",
+        (language_code, device, align_model),
+        lambda: load_align_model(
+            language_code=language_code, device=device, model_name=align_model
+        ),
+    )
+
+
+def load_diarization_pipeline(device, embedding_batch_size):
+    """
+    Load a diarization pipeline computing speaker embeddings in the given batches.
+
+    Args:
+        device (str): Device to use for inference.
+        embedding_batch_size (int): Batch size used to compute speaker embeddings.
+
+    Returns:
+        DiarizationPipeline: The diarization pipeline.
+    """
+    pipeline = DiarizationPipeline(use_auth_token=HF_TOKEN, device=device)
+    # pyannote defaults to 32, which needs far more VRAM than a small card has
+    pipeline.model.embedding_batch_size = embedding_batch_size
+    return pipeline
+
+
+def get_diarization_pipeline(device, embedding_batch_size=8):
+    """
+    Get the cached diarization pipeline.
+
+    The batch size is part of the cache key rather than set on a shared
+    pipeline, so concurrent jobs cannot change it under each other.
+
+    Args:
+        device (str): Device to use for inference.
+        embedding_batch_size (int): Batch size used to compute speaker embeddings.
+
+    Returns:
+        DiarizationPipeline: The diarization pipeline.
+    """
+    return get_cached_model(
+        "diarize",
+        (device, embedding_batch_size),
+        lambda: load_diarization_pipeline(device, embedding_batch_size),
+    )
+
+
+def preload_models():
+    """Load the default Whisper, alignment and diarization models into the cache."""
+    logger.info(
+        "Preloading models - whisper: %s, language: %s, device: %s",
+        WHISPER_MODEL,
+        LANG,
+        device,
+    )
+    if WHISPER_MODEL:
+        get_whisper_model(WHISPER_MODEL, device, 0, compute_type, 4)
+    get_align_model(LANG, device)
+    get_diarization_pipeline(device)
+
 
 def transcribe_with_whisper(
     audio,
@@ -59,10 +263,10 @@ def transcribe_with_whisper(
         WHISPER_MODEL,
         device,
     )
-    # Log GPU memory before loading model
+    # Log GPU memory before transcription
     if torch.cuda.is_available():
         logger.debug(
-            f"GPU memory before loading model - used: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
+            f"GPU memory before transcription - used: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
         )
     faster_whisper_threads = 4
     if (threads := threads) > 0:
@@ -86,6 +290,9 @@ def transcribe_with_whisper(
         asr_options=asr_options,
         vad_options=vad_options,
         language=language,
+        model=get_whisper_model(
+            model.value, device, device_index, compute_type, faster_whisper_threads
+        ),
         task=task,
         threads=faster_whisper_threads,
     )
@@ -94,63 +301,48 @@ def transcribe_with_whisper(
         audio=audio, batch_size=batch_size, chunk_size=chunk_size, language=language
     )
 
-    # Log GPU memory before cleanup
+    # The models stay cached, see clear_model_cache to release their memory
     if torch.cuda.is_available():
         logger.debug(
-            f"GPU memory before cleanup: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
-        )
-
-    # delete model
-    gc.collect()
-    torch.cuda.empty_cache()
-    del model
-
-    # Log GPU memory after cleanup
-    if torch.cuda.is_available():
-        logger.debug(
-            f"GPU memory after cleanup: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
+            f"GPU memory after transcription - used: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
         )
 
     logger.debug("Completed transcription")
     return result
 
 
-def diarize(audio, device: str = device, min_speakers=None, max_speakers=None):
+def diarize(
+    audio,
+    device: str = device,
+    min_speakers=None,
+    max_speakers=None,
+    embedding_batch_size: int = 8,
+):
     """
     Diarize an audio file using the PyAnnotate model.
 
     Args:
        audio (Audio): The audio to diarize.
+       embedding_batch_size (int): Batch size used to compute speaker embeddings.
 
     Returns:
        Diarizartion: The diarization result.
     """
     logger.debug("Starting diarization with device: %s", device)
 
-    # Log GPU memory before loading model
+    # Log GPU memory before diarization
     if torch.cuda.is_available():
         logger.debug(
-            f"GPU memory before loading model - used: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
+            f"GPU memory before diarization - used: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
         )
 
-    model = DiarizationPipeline(use_auth_token=HF_TOKEN, device=device)
+    model = get_diarization_pipeline(device, embedding_batch_size)
     result = model(audio=audio, min_speakers=min_speakers, max_speakers=max_speakers)
 
-    # Log GPU memory before cleanup
+    # The models stay cached, see clear_model_cache to release their memory
     if torch.cuda.is_available():
         logger.debug(
-            f"GPU memory before cleanup: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
-        )
-
-    # delete model
-    gc.collect()
-    torch.cuda.empty_cache()
-    del model
-
-    # Log GPU memory after cleanup
-    if torch.cuda.is_available():
-        logger.debug(
-            f"GPU memory after cleanup: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
+            f"GPU memory after diarization - used: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
         )
 
     logger.debug("Completed diarization with device: %s", device)
@@ -186,10 +378,10 @@ def align_whisper_output(
         device,
     )
 
-    # Log GPU memory before loading model
+    # Log GPU memory before alignment
     if torch.cuda.is_available():
         logger.debug(
-            f"GPU memory before loading model - used: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
+            f"GPU memory before alignment - used: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
         )
 
     logger.debug(
@@ -199,9 +391,7 @@ def align_whisper_output(
         interpolate_method,
         return_char_alignments,
     )
-    align_model, align_metadata = load_align_model(
-        language_code=language_code, device=device, model_name=align_model
-    )
+    align_model, align_metadata = get_align_model(language_code, device, align_model)
 
     result = align(
         transcript,
@@ -213,22 +403,10 @@ def align_whisper_output(
         return_char_alignments=return_char_alignments,
     )
 
-    # Log GPU memory before cleanup
-    if torch.cuda.is_available():
-        logger.debug(
-            f"GPU memory before cleanup: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
-        )
-
-    # delete model
-    gc.collect()
-    torch.cuda.empty_cache()
-    del align_model
-    del align_metadata
-
-    # Log GPU memory after cleanup
+    # The models stay cached, see clear_model_cache to release their memory
     if torch.cuda.is_available():
         logger.debug(
-            f"GPU memory after cleanup: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
+            f"GPU memory after alignment - used: {torch.cuda.memory_allocated()/1024**2:.2f} MB, available: {torch.cuda.get_device_properties(0).total_memory/1024**2:.2f} MB"
         )
 
     logger.debug("Completed alignment")
@@ -239,9 +417,12 @@ def process_audio_common(params: SpeechToTextProcessingParams, session):
     """
     Process an audio clip to generate a transcript with speaker labels.
 
+    The uploaded file is decoded here rather than in the request handler,
+    so the task identifier is returned before ffmpeg runs.
+
     Args:
-        audio (Audio): The input audio
-        identifier (str): The identifier for the request
+        params (SpeechToTextProcessingParams): The audio file and processing parameters.
+        session (Session): The database session.
 
     Returns:
         None: The result is saved in the transcription requests dict.
@@ -253,6 +434,23 @@ def process_audio_common(params: SpeechToTextProcessingParams, session):
             params.identifier,
         )
 
+        try:
+            audio = process_audio_file(params.audio_file)
+        finally:
+            # The upload is not needed once decoded, nor when ffmpeg rejects it
+            os.remove(params.audio_file)
+        audio_duration = get_audio_duration(audio)
+        logger.info(
+            "Audio file for identifier %s length: %s seconds",
+            params.identifier,
+            audio_duration,
+        )
+        update_task_status_in_db(
+            identifier=params.identifier,
+            update_data={"audio_duration": audio_duration},
+            session=session,
+        )
+
         logger.debug(
             "Transcription parameters - task: %s, language: %s, batch_size: %d, chunk_size: %d, model: %s, device: %s, device_index: %d, compute_type: %s, threads: %d",
             params.whisper_model_params.task,
@@ -267,7 +465,7 @@ def process_audio_common(params: SpeechToTextProcessingParams, session):
         )
 
         segments_before_alignment = transcribe_with_whisper(
-            audio=params.audio,
+            audio=audio,
             task=params.whisper_model_params.task.value,
             asr_options=params.asr_options,
             vad_options=params.vad_options,
@@ -290,31 +488,39 @@ def process_audio_common(params: SpeechToTextProcessingParams, session):
         )
         segments_transcript = align_whisper_output(
             transcript=segments_before_alignment["segments"],
-            audio=params.audio,
+            audio=audio,
             language_code=segments_before_alignment["language"],
             align_model=params.alignment_params.align_model,
             interpolate_method=params.alignment_params.interpolate_method,
             return_char_alignments=params.alignment_params.return_char_alignments,
         )
-        transcript = AlignedTranscription(**segments_transcript)
         # removing words within each segment that have missing start, end, or score values
-        transcript = filter_aligned_transcription(transcript).model_dump()
-
-        logger.debug(
-            "Diarization parameters - device: %s, min_speakers: %s, max_speakers: %s",
-            params.whisper_model_params.device,
-            params.diarization_params.min_speakers,
-            params.diarization_params.max_speakers,
-        )
-        diarization_segments = diarize(
-            params.audio,
-            device=params.whisper_model_params.device,
-            min_speakers=params.diarization_params.min_speakers,
-            max_speakers=params.diarization_params.max_speakers,
-        )
-
-        logger.debug("Starting to combine transcript with diarization results")
-        result = assign_word_speakers(diarization_segments, transcript)
+        transcript = filter_aligned_transcription_dict(segments_transcript)
+
+        if transcript["segments"]:
+            logger.debug(
+                "Diarization parameters - device: %s, min_speakers: %s, max_speakers: %s",
+                params.whisper_model_params.device,
+                params.diarization_params.min_speakers,
+                params.diarization_params.max_speakers,
+            )
+            diarization_segments = diarize(
+                audio,
+                device=params.whisper_model_params.device,
+                min_speakers=params.diarization_params.min_speakers,
+                max_speakers=params.diarization_params.max_speakers,
+                embedding_batch_size=params.diarization_params.embedding_batch_size,
+            )
+
+            logger.debug("Starting to combine transcript with diarization results")
+            result = assign_word_speakers(diarization_segments, transcript)
+        else:
+            # No speech was transcribed, so there are no speakers to assign
+            logger.info(
+                "Empty transcript, diarization skipped for identifier: %s",
+                params.identifier,
+            )
+            result = transcript
 
         for segment in result["segments"]:
             del segment["words"]
@@ -4,11 +4,22 @@ import json
 import os
 import tempfile
 import time
-
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 
-from app import main
+from app import jobs, main, tasks, whisperx_services
+from app.routers import stt
+from app.config import Config
+from app.db import SessionLocal
+from app.schemas import SpeechToTextProcessingParams, TaskEnum
 
 client = TestClient(main.app)
 
@@ -34,6 +45,41 @@ def set_env_variable(monkeypatch):
     # monkeypatch.setenv("COMPUTE_TYPE", "int8")
 
 
+@pytest.fixture
+def task_status_cache(monkeypatch):
+    """
+    Give a test an empty task status cache with a clock it controls.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The monkeypatch fixture.
+
+    Returns:
+        list: The current time of the cache clock, as its only element.
+    """
+    clock = [1000.0]
+    monkeypatch.setattr(tasks, "_task_status_cache", OrderedDict())
+    monkeypatch.setattr(tasks, "_task_status_cache_bytes", 0)
+    monkeypatch.setattr(tasks, "_task_status_generations", OrderedDict())
+    monkeypatch.setattr(tasks, "_task_status_generation_floor", 0)
+    monkeypatch.setattr(tasks, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    monkeypatch.setattr(Config, "CACHE_TTL_PROCESSING", 2)
+    monkeypatch.setattr(Config, "CACHE_TTL_DONE", 300)
+    return clock
+
+
+def cache_status(identifier, status, size=0):
+    """
+    Cache a task status the way the status queries do.
+
+    Args:
+        identifier (str): The task identifier.
+        status (str): The status of the task.
+        size (int): The size of its result JSON in bytes.
+    """
+    generation = tasks.get_task_status_generation(identifier)
+    tasks.cache_task_status(identifier, {"status": status}, size, generation)
+
+
 def test_index():
     """Test the index route to ensure it redirects to the documentation."""
     response = client.get("/", allow_redirects=False)
@@ -57,7 +103,7 @@ def get_task_status(identifier):
     return None
 
 
-def wait_for_task_completion(identifier, max_attempts=2, delay=10):
+def wait_for_task_completion(identifier, max_attempts=6, delay=10):
     """
     Wait for a task to complete by polling its status.
 
@@ -246,6 +292,93 @@ def test_diarize():
     assert diarize() is not None
 
 
+def test_diarize_silence():
+    """Test that a silent file completes diarization without running the pipeline."""
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as silence:
+        with wave.open(silence, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(b"\x00\x00" * 16000)
+    try:
+        with open(silence.name, "rb") as audio_file:
+            response = client.post(
+                f"/service/diarize?device={os.getenv('DEVICE')}",
+                files={"file": ("silence.wav", audio_file)},
+            )
+    finally:
+        os.remove(silence.name)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Task completed, no speech"
+
+    task_result = client.get(f"/task/{response.json()['identifier']}").json()
+    assert task_result["status"] == "completed"
+    assert task_result["result"] == []
+    assert task_result["metadata"]["end_time"] is not None
+
+
+def test_speech_to_text_empty_transcript(monkeypatch):
+    """Test that diarization is skipped when nothing was transcribed."""
+    diarized = []
+    monkeypatch.setattr(
+        whisperx_services,
+        "process_audio_file",
+        lambda audio_file: np.zeros(16000, dtype=np.float32),
+    )
+    monkeypatch.setattr(
+        whisperx_services,
+        "transcribe_with_whisper",
+        lambda **kwargs: {"segments": [], "language": "en"},
+    )
+    monkeypatch.setattr(
+        whisperx_services,
+        "align_whisper_output",
+        lambda **kwargs: {"segments": [], "word_segments": []},
+    )
+    monkeypatch.setattr(
+        whisperx_services, "diarize", lambda *args, **kwargs: diarized.append(args)
+    )
+
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as audio_file:
+        pass
+    with SessionLocal() as session:
+        identifier = tasks.add_task_to_db(
+            session=session, status="processing", task_type="full_process"
+        )
+        params = SpeechToTextProcessingParams(
+            audio_file=audio_file.name,
+            identifier=identifier,
+            vad_options={},
+            asr_options={},
+            whisper_model_params=SimpleNamespace(
+                task=TaskEnum.transcribe,
+                language="en",
+                batch_size=8,
+                chunk_size=20,
+                model="tiny",
+                device="cpu",
+                device_index=0,
+                compute_type="int8",
+                threads=0,
+            ),
+            alignment_params=SimpleNamespace(
+                align_model=None,
+                interpolate_method="nearest",
+                return_char_alignments=False,
+            ),
+            diarization_params=SimpleNamespace(
+                min_speakers=None, max_speakers=None, embedding_batch_size=8
+            ),
+        )
+        whisperx_services.process_audio_common(params, session)
+
+    assert diarized == []
+    assert not os.path.exists(audio_file.name)
+    task_result = client.get(f"/task/{identifier}").json()
+    assert task_result["status"] == "completed"
+    assert task_result["result"] == {"segments": []}
+
+
 @pytest.mark.skipif(os.getenv("DEVICE") == "cpu", reason="Test requires GPU")
 def test_flow():
     """Test the complete flow of transcription, alignment, diarization, and combination."""
@@ -321,6 +454,56 @@ def test_speech_to_text_url():
     ) or seg_0_text.lower().startswith(TRANSCRIPT_RESULT_2.lower())
 
 
+class FailingStream(httpx.AsyncByteStream):
+    """Response body that breaks off after its first chunk."""
+
+    async def __aiter__(self):
+        """Yield a chunk, then fail like a dropped connection."""
+        yield b"partial audio"
+        raise httpx.ReadError("Connection reset")
+
+
+def test_speech_to_text_url_download_error(monkeypatch, tmp_path):
+    """Test that a failed download is reported as a 400 and leaves no temporary file."""
+
+    def handler(request):
+        if request.url.path == "/refused.mp3":
+            raise httpx.ConnectError("Connection refused", request=request)
+        if request.url.path == "/missing.mp3":
+            return httpx.Response(404)
+        return httpx.Response(200, stream=FailingStream())
+
+    monkeypatch.setattr(
+        stt, "http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    for path in ("/refused.mp3", "/missing.mp3", "/dropped.mp3"):
+        response = client.post(
+            "/speech-to-text-url", data={"url": f"http://audio.test{path}"}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Could not download file")
+        assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_job():
+    """Test that a job raising an unhandled error marks its task as failed."""
+
+    def process(message, session):
+        raise TypeError(message)
+
+    with SessionLocal() as session:
+        identifier = tasks.add_task_to_db(
+            session=session, status="processing", task_type="transcription"
+        )
+    jobs.submit_job(identifier, process, "Unexpected error").result(timeout=30)
+
+    task_result = client.get(f"/task/{identifier}").json()
+    assert task_result["status"] == "failed"
+    assert task_result["error"] == "Unexpected error"
+
+
 def test_get_all_tasks_status():
     """Test retrieving the status of all tasks."""
     response = client.get("/task/all")
@@ -329,6 +512,24 @@ def test_get_all_tasks_status():
     assert isinstance(response.json()["tasks"], list)
 
 
+def test_stream_all_tasks_status():
+    """Test streaming the status of all tasks as NDJSON."""
+    response = client.get("/task/all.ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    tasks = [json.loads(line) for line in response.text.splitlines()]
+    assert tasks == client.get("/task/all").json()["tasks"]
+
+
+def test_get_tasks_status():
+    """Test retrieving the status of several tasks at once."""
+    tasks = client.get("/task/all").json()["tasks"]
+    identifiers = [task["identifier"] for task in tasks[:2]]
+    response = client.get("/task", params={"ids": identifiers + ["unknown"]})
+    assert response.status_code == 200
+    assert sorted(response.json()) == sorted(identifiers)
+
+
 def test_delete_task():
     """Test deleting a task."""
     # Create a task first to delete
@@ -353,3 +554,234 @@ def test_delete_task():
     get_response = client.get(f"/task/{identifier}")
     assert get_response.status_code == 404
     assert get_response.json()["detail"] == "Identifier not found"
+
+
+def test_flush_model_cache():
+    """Test flushing the cached models."""
+    response = client.post("/models/flush")
+    assert response.status_code == 200
+    assert response.json()["message"].startswith("Flushed")
+
+
+@pytest.fixture
+def model_cache(monkeypatch):
+    """
+    Give a test an empty model cache holding at most two models.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The monkeypatch fixture.
+
+    Returns:
+        OrderedDict: The model cache.
+    """
+    cache = OrderedDict()
+    monkeypatch.setattr(whisperx_services, "_model_cache", cache)
+    monkeypatch.setattr(whisperx_services, "_model_load_locks", {})
+    monkeypatch.setattr(whisperx_services, "MODEL_CACHE_SIZE", 2)
+    return cache
+
+
+def test_model_cache_eviction(model_cache):
+    """Test that the least recently used model is evicted when the cache is full."""
+    loaded = []
+
+    def loader(name):
+        loaded.append(name)
+        return name
+
+    for name in ("a", "b", "a", "c", "a"):
+        model = whisperx_services.get_cached_model(
+            "whisper", (name,), lambda: loader(name)
+        )
+        assert model == name
+
+    assert loaded == ["a", "b", "c"]
+    assert list(model_cache) == [("whisper", "c"), ("whisper", "a")]
+
+
+def test_model_cache_single_load(model_cache):
+    """Test that concurrent requests for the same model load it once."""
+    loaded = []
+    release = Event()
+
+    def loader():
+        loaded.append(object())
+        release.wait(5)
+        return loaded[-1]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(
+                whisperx_services.get_cached_model, "align", ("en",), loader
+            )
+            for _ in range(4)
+        ]
+        time.sleep(0.2)
+        release.set()
+        models = [future.result() for future in futures]
+
+    assert len(loaded) == 1
+    assert all(model is loaded[0] for model in models)
+    assert whisperx_services._model_load_locks == {}
+
+
+def test_clear_model_cache(model_cache):
+    """Test that flushing the model cache drops every cached model."""
+    for name in ("a", "b"):
+        whisperx_services.get_cached_model("whisper", (name,), lambda: name)
+
+    assert whisperx_services.clear_model_cache() == 2
+    assert len(model_cache) == 0
+
+
+def test_task_status_etag():
+    """Test that a finished task is not sent again when its ETag matches."""
+    with open("tests/test_files/aligned_transcript.json", "rb") as transcript, open(
+        "tests/test_files/diarazition.json", "rb"
+    ) as diarization:
+        files = {
+            "aligned_transcript": ("aligned_transcript.json", transcript),
+            "diarization_result": ("diarazition.json", diarization),
+        }
+        response = client.post("/service/combine", files=files)
+    assert response.status_code == 200
+    identifier = response.json()["identifier"]
+    assert wait_for_task_completion(identifier)
+
+    response = client.get(f"/task/{identifier}")
+    etag = response.headers["ETag"]
+
+    response = client.get(f"/task/{identifier}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["Cache-Control"] == "public, max-age=1"
+
+    # Lists of ETags, weak variants and "*" match as well
+    for if_none_match in (f'"other", {etag}', f"W/{etag}", "*"):
+        response = client.get(
+            f"/task/{identifier}", headers={"If-None-Match": if_none_match}
+        )
+        assert response.status_code == 304
+
+    response = client.get(f"/task/{identifier}", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_task_status_etag_in_progress():
+    """Test that a task in progress gets a weak ETag that can be revalidated."""
+    with SessionLocal() as session:
+        identifier = tasks.add_task_to_db(
+            session=session, status="processing", task_type="transcription"
+        )
+
+    response = client.get(f"/task/{identifier}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    response = client.get(f"/task/{identifier}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    # Once the task finishes its ETag changes, so the status is sent again
+    with SessionLocal() as session:
+        tasks.update_task_status_in_db(identifier, {"status": "completed"}, session)
+    response = client.get(f"/task/{identifier}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+
+
+def test_task_status_cache_ttl(task_status_cache):
+    """Test that finished tasks are cached longer than tasks in progress."""
+    cache_status("processing", "processing")
+    cache_status("completed", "completed")
+    cache_status("failed", "failed")
+
+    task_status_cache[0] += 3
+    assert tasks.get_cached_task_status("processing") is None
+    assert tasks.get_cached_task_status("completed") == {"status": "completed"}
+    assert tasks.get_cached_task_status("failed") == {"status": "failed"}
+
+    task_status_cache[0] += 300
+    assert tasks.get_cached_task_status("completed") is None
+    assert tasks.get_cached_task_status("failed") is None
+
+
+def test_task_status_cache_size(task_status_cache, monkeypatch):
+    """Test that the least recently used status is evicted when the cache is full."""
+    monkeypatch.setattr(tasks, "TASK_STATUS_CACHE_SIZE", 2)
+    cache_status("a", "completed")
+    cache_status("b", "completed")
+    assert tasks.get_cached_task_status("a") is not None
+    cache_status("c", "completed")
+
+    assert list(tasks._task_status_cache) == ["a", "c"]
+
+
+def test_task_status_cache_max_bytes(task_status_cache, monkeypatch):
+    """Test that the cache is bounded by the size of the cached results."""
+    monkeypatch.setattr(tasks, "TASK_STATUS_CACHE_MAX_BYTES", 100)
+    cache_status("a", "completed", 40)
+    cache_status("b", "completed", 40)
+    cache_status("c", "completed", 40)
+    assert list(tasks._task_status_cache) == ["b", "c"]
+    assert tasks._task_status_cache_bytes == 80
+
+    # A result larger than the whole budget is not cached at all
+    cache_status("d", "completed", 101)
+    assert list(tasks._task_status_cache) == ["b", "c"]
+    assert tasks._task_status_cache_bytes == 80
+
+
+def test_task_status_cache_sweep(task_status_cache):
+    """Test that expired statuses are swept when another status is cached."""
+    cache_status("a", "processing", 10)
+    cache_status("b", "completed", 10)
+    task_status_cache[0] += 3
+    cache_status("c", "completed", 10)
+
+    assert list(tasks._task_status_cache) == ["b", "c"]
+    assert tasks._task_status_cache_bytes == 20
+
+
+def test_task_status_cache_invalidation(task_status_cache):
+    """Test that updating or deleting a task removes its cached status."""
+    with SessionLocal() as session:
+        identifier = tasks.add_task_to_db(
+            session=session, status="processing", task_type="transcription"
+        )
+        assert tasks.get_task_status_from_db(identifier, session)["status"] == (
+            "processing"
+        )
+        assert tasks.get_cached_task_status(identifier) is not None
+
+        tasks.update_task_status_in_db(identifier, {"status": "completed"}, session)
+        assert tasks.get_cached_task_status(identifier) is None
+        assert tasks.get_task_status_from_db(identifier, session)["status"] == (
+            "completed"
+        )
+
+        assert tasks.delete_task_from_db(identifier, session)
+        assert tasks.get_cached_task_status(identifier) is None
+        assert tasks.get_task_status_from_db(identifier, session) is None
+
+
+def test_task_status_cache_stale_read(task_status_cache, monkeypatch):
+    """Test that a status read before an invalidation is not cached after it."""
+    generation = tasks.get_task_status_generation("a")
+    tasks.invalidate_task_status("a")
+    tasks.cache_task_status("a", {"status": "processing"}, 0, generation)
+    assert tasks.get_cached_task_status("a") is None
+
+    # Tasks whose generation is forgotten still fail the check
+    monkeypatch.setattr(tasks, "TASK_STATUS_GENERATIONS_SIZE", 1)
+    generation = tasks.get_task_status_generation("b")
+    tasks.invalidate_task_status("b")
+    tasks.invalidate_task_status("c")
+    tasks.cache_task_status("b", {"status": "processing"}, 0, generation)
+    assert tasks.get_cached_task_status("b") is None
+
+    cache_status("b", "processing")
+    assert tasks.get_cached_task_status("b") is not None